@@ -0,0 +1,117 @@
+"""
+Optional fast paths for large numeric series and array/DataFrame inputs.
+
+NumPy is never imported eagerly: if it is not already loaded, no ndarray
+can have been passed in, so the checks here only look at sys.modules.
+"""
+
+import sys
+from typing import Any, List, Optional
+
+# Below this many points the row-dict path is cheap enough
+FASTPATH_MIN_SIZE = 512
+
+
+class Columns(dict):
+    """
+    Parallel columns {field: [values]}.
+    
+    A marker type: only data of this type is sent as columns, so a plain
+    dict can still be passed through as a single inline record.
+    """
+    
+    __slots__ = ()
+
+
+def _numpy():
+    """Return the NumPy module if it has already been imported, else None."""
+    return sys.modules.get("numpy")
+
+
+def _to_list(values: Any) -> List:
+    """Convert a series to a JSON-friendly list, using NumPy's C-level tolist()."""
+    np = _numpy()
+    if np is not None and isinstance(values, np.ndarray):
+        if values.dtype.kind == "M":
+            return np.datetime_as_string(values).tolist()
+        return values.tolist()
+    return list(values)
+
+
+def is_large_numeric(values: Any) -> bool:
+    """Check whether values is a 1-D numeric array big enough for the fast path."""
+    np = _numpy()
+    return (
+        np is not None
+        and isinstance(values, np.ndarray)
+        and values.ndim == 1
+        and values.dtype.kind in "iuf"
+        and values.size > FASTPATH_MIN_SIZE
+    )
+
+
+def columnar_series(x_key: str, y_key: str, xs: Any, ys: Any) -> Optional[Columns]:
+    """
+    Build a columnar payload {x_key: [...], y_key: [...]} for a large numeric series.
+
+    Returns None when ys is not eligible (not a large numeric array, or
+    contains NaN/inf), so the caller can fall back to row records.
+    """
+    if not is_large_numeric(ys):
+        return None
+    if ys.dtype.kind == "f" and not _numpy().isfinite(ys).all():
+        return None
+
+    if not hasattr(xs, "__len__"):
+        xs = list(xs)
+    n = min(len(xs), ys.size)
+    return Columns({x_key: _to_list(xs[:n]), y_key: ys[:n].tolist()})
+
+
+def to_columns(data: Any) -> Optional[Columns]:
+    """
+    Convert a pandas DataFrame or NumPy structured array to {column: [values]}.
+
+    Returns None for anything else (e.g. a list of row dicts). pandas is
+    duck-typed so it is never imported here.
+    """
+    if hasattr(data, "columns") and hasattr(data, "to_numpy"):
+        return Columns({str(col): _to_list(data[col].to_numpy()) for col in data.columns})
+    np = _numpy()
+    if np is not None and isinstance(data, np.ndarray) and data.dtype.names:
+        return Columns({name: _to_list(data[name]) for name in data.dtype.names})
+    return None
+
+
+def matrix_cells(
+    matrix: Any,
+    x_labels: Optional[List] = None,
+    y_labels: Optional[List] = None,
+    skip_zeros: bool = True,
+) -> Columns:
+    """
+    Flatten a 2-D matrix into heatmap columns {"x": [...], "y": [...], "value": [...]}.
+
+    Columns map to x and rows to y. With skip_zeros only nonzero cells are
+    emitted, which keeps sparse matrices small.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("matrix input requires numpy: pip install dynamic-viz[fast]") from None
+
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2-D matrix, got {matrix.ndim} dimension(s)")
+
+    if skip_zeros:
+        ys, xs = np.nonzero(matrix)
+    else:
+        ys, xs = np.indices(matrix.shape).reshape(2, -1)
+    values = matrix[ys, xs]
+
+    if x_labels is not None:
+        xs = np.asarray(x_labels)[xs]
+    if y_labels is not None:
+        ys = np.asarray(y_labels)[ys]
+    return Columns({"x": _to_list(xs), "y": _to_list(ys), "value": _to_list(values)})
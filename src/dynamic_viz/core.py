@@ -5,24 +5,96 @@ Allows AI/LLM to programmatically request custom visualizations
 to explain insights and findings.
 """
 
+import hashlib
+import importlib.util
 import json
 import logging
-from typing import Dict, List, Any, Optional
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
+from . import _fastpath
+from ._fastpath import Columns
 from .config import BRAND, BRAND_PALETTE
 
 logger = logging.getLogger(__name__)
 
-# Try Altair first, fall back to raw Vega-Lite
-try:
-    import altair as alt
-    ALTAIR_AVAILABLE = True
+# Try Altair first, fall back to raw Vega-Lite. Only check that the package
+# is installed; importing it is slow and nothing here needs the module yet.
+ALTAIR_AVAILABLE = importlib.util.find_spec("altair") is not None
+if ALTAIR_AVAILABLE:
     logger.info("[DynamicViz] Altair available - using full chart generation")
-except ImportError:
-    ALTAIR_AVAILABLE = False
+else:
     logger.info("[DynamicViz] Altair not available - using Vega-Lite fallback")
 
 
+# Prefer orjson for serializing specs, fall back to the stdlib encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert NumPy scalars and arrays, which short series can leave in rows."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_bytes(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, e.g. for hashing."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_json_default).encode()
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a spec (or list of specs) to a JSON string."""
+    if ORJSON_AVAILABLE:
+        return _dumps_bytes(obj).decode()
+    return json.dumps(obj, default=_json_default)
+
+
+# =============================================================================
+# SHARED SPEC FRAGMENTS
+# =============================================================================
+
+_VEGA_LITE_SCHEMA = "https://vega.github.io/schema/vega-lite/v5.json"
+_GRID_COLOR = "#374151"
+
+# Like the config block, this color scale is shared by reference between
+# every palette-colored spec, so it must not be mutated
+_PALETTE_SCALE = {"range": list(BRAND_PALETTE)}
+
+
+@lru_cache(maxsize=8)
+def _base_config(background: str, text: str, text_muted: str) -> Dict:
+    """
+    Build the brand styling block shared by every generated spec.
+    
+    Cached on the brand colors, so overriding BRAND still takes effect.
+    The returned dict is shared between specs and must not be mutated.
+    """
+    return {
+        "background": background,
+        "view": {"stroke": None},
+        "axis": {
+            "labelColor": text_muted,
+            "titleColor": text,
+            "gridColor": _GRID_COLOR,
+        },
+        "legend": {
+            "labelColor": text_muted,
+            "titleColor": text,
+        },
+    }
+
+
 # =============================================================================
 # VISUALIZATION REQUEST TYPES
 # =============================================================================
@@ -47,11 +119,16 @@ class VizRequest:
         'timeline',      # Events over time
     ]
     
+    __slots__ = (
+        'title', 'chart_type', 'data', 'x_field', 'y_field', 'color_field',
+        'description', 'insight', '_created_ts', '_created_at',
+    )
+    
     def __init__(
         self,
         title: str,
         chart_type: str,
-        data: List[Dict],
+        data: Union[List[Dict], Dict, Columns, Any],
         x_field: str = None,
         y_field: str = None,
         color_field: str = None,
@@ -64,22 +141,97 @@ class VizRequest:
         Args:
             title: Chart title
             chart_type: One of CHART_TYPES
-            data: List of data points [{field: value, ...}]
+            data: List of data points [{field: value, ...}], or Columns
+                {field: [values]} for large series. A pandas DataFrame or
+                NumPy structured array is converted to Columns; a plain dict
+                is passed through as a single inline record.
             x_field: Field for x-axis
             y_field: Field for y-axis  
             color_field: Field for color encoding
             description: What this chart shows
             insight: The key takeaway/insight
         """
+        if chart_type not in _CHART_TYPE_SET:
+            chart_type = 'bar'
+        columns = _fastpath.to_columns(data)
+        if columns is not None:
+            data = columns
+        self._init_fields(
+            title, chart_type, data, x_field, y_field, color_field, description, insight,
+        )
+    
+    def _init_fields(
+        self,
+        title: str,
+        chart_type: str,
+        data: Union[List[Dict], Dict, Columns],
+        x_field: Optional[str],
+        y_field: Optional[str],
+        color_field: Optional[str],
+        description: str,
+        insight: str,
+    ) -> None:
+        """Assign every slot from already-validated values; shared by all constructors."""
         self.title = title
-        self.chart_type = chart_type if chart_type in self.CHART_TYPES else 'bar'
+        self.chart_type = chart_type
         self.data = data
         self.x_field = x_field
         self.y_field = y_field
         self.color_field = color_field
         self.description = description
         self.insight = insight
-        self.created_at = datetime.now().isoformat()
+        # Formatting is deferred until created_at is first read
+        self._created_ts = time.time()
+        self._created_at: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, req_dict: Dict) -> 'VizRequest':
+        """Build a request from an API dict, filling in defaults."""
+        # Plain .get() calls benchmark faster than merging req_dict into a
+        # defaults dict and unpacking it, so keep them explicit.
+        return cls(
+            title=req_dict.get('title', 'Chart'),
+            chart_type=req_dict.get('chart_type', 'bar'),
+            data=req_dict.get('data', []),
+            x_field=req_dict.get('x_field'),
+            y_field=req_dict.get('y_field'),
+            color_field=req_dict.get('color_field'),
+            description=req_dict.get('description', ''),
+            insight=req_dict.get('insight', ''),
+        )
+    
+    @classmethod
+    def _from_validated(cls, req: Dict) -> 'VizRequest':
+        """
+        Build a request from a dict known to be complete and valid.
+        
+        Skips argument parsing and validation: req must have every field
+        from to_dict() (created_at excepted), with a chart_type from
+        CHART_TYPES and data already in its final form (rows, a record
+        or Columns).
+        """
+        request = cls.__new__(cls)
+        request._init_fields(
+            req['title'], req['chart_type'], req['data'], req['x_field'],
+            req['y_field'], req['color_field'], req['description'], req['insight'],
+        )
+        return request
+    
+    @property
+    def _is_columnar(self) -> bool:
+        """Whether data holds parallel columns rather than row dicts."""
+        return isinstance(self.data, Columns)
+    
+    @property
+    def created_at(self) -> str:
+        """ISO-8601 local timestamp of when the request was created."""
+        if self._created_at is None:
+            self._created_at = datetime.fromtimestamp(self._created_ts).isoformat()
+        return self._created_at
+    
+    def row_count(self) -> int:
+        """Number of data points, for row, single-record and columnar data."""
+        return _row_count(self.data)
     
     def to_dict(self) -> Dict:
         return {
@@ -95,6 +247,262 @@ class VizRequest:
         }
 
 
+_CHART_TYPE_SET = frozenset(VizRequest.CHART_TYPES)
+
+
+# =============================================================================
+# CHART TEMPLATES
+# =============================================================================
+
+@dataclass(frozen=True)
+class Channel:
+    """
+    One encoding channel of a chart template.
+    
+    The field comes from the first of `sources` (VizRequest field names)
+    set on the request, falling back to `default`, which is then required.
+    A channel with neither only carries its `extra` keys, e.g. a constant
+    {"value": 0}.
+    """
+    name: str
+    sources: Tuple[str, ...] = ()
+    default: Optional[str] = None
+    type: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, eq=False)
+class ChartTemplate:
+    """
+    Data-driven description of a chart type.
+    
+    color_mode decides how the color channel is styled:
+        'palette': nominal field colored with BRAND_PALETTE
+        'fixed':   a single constant color, colors[0]
+        'range':   field colored along a scale ranging over colors
+    Entries in colors are BRAND keys (looked up per call) or literal colors.
+    """
+    mark: Any
+    channels: Tuple[Channel, ...]
+    color: Optional[Channel] = None
+    color_mode: str = 'palette'
+    colors: Tuple[str, ...] = ()
+    tooltip: Tuple[Channel, ...] = ()
+    layout: Dict[str, Any] = field(default_factory=dict)
+    data_builder: Optional[Callable[[VizRequest], List[Dict]]] = None
+
+
+def _gauge_data(request: VizRequest) -> List[Dict]:
+    """Split a single metric into value/remaining arc segments."""
+    # Extract the value from data
+    field_name = request.y_field or 'value'
+    if request._is_columnar:
+        value = (request.data.get(field_name) or [50])[0]
+    else:
+        value = request.data[0].get(field_name, 50) if request.data else 50
+    max_val = 100
+    
+    return [
+        {"segment": "Value", "value": value},
+        {"segment": "Remaining", "value": max_val - value},
+    ]
+
+
+_CHART_TEMPLATES: Dict[str, ChartTemplate] = {
+    'bar': ChartTemplate(
+        mark={"type": "bar", "cornerRadiusEnd": 4},
+        channels=(
+            Channel("x", ("x_field",), "category", "nominal", {"title": None}),
+            Channel("y", ("y_field",), "value", "quantitative"),
+        ),
+        color=Channel("color", ("color_field", "x_field"), "category", "nominal", {"legend": None}),
+        tooltip=(
+            Channel("tooltip", ("x_field",), "category"),
+            Channel("tooltip", ("y_field",), "value"),
+        ),
+    ),
+    'line': ChartTemplate(
+        mark={"type": "line", "strokeWidth": 3, "point": True},
+        channels=(
+            Channel("x", ("x_field",), "date", "temporal", {"title": None}),
+            Channel("y", ("y_field",), "value", "quantitative"),
+        ),
+        color=Channel("color"),
+        color_mode='fixed',
+        colors=("cyan",),
+        tooltip=(
+            Channel("tooltip", ("x_field",), "date"),
+            Channel("tooltip", ("y_field",), "value"),
+        ),
+    ),
+    'scatter': ChartTemplate(
+        mark={"type": "circle", "size": 80},
+        channels=(
+            Channel("x", ("x_field",), "x", "quantitative"),
+            Channel("y", ("y_field",), "y", "quantitative"),
+        ),
+        color=Channel("color", ("color_field",), "category", "nominal"),
+        tooltip=(
+            Channel("tooltip", ("x_field",), "x"),
+            Channel("tooltip", ("y_field",), "y"),
+        ),
+    ),
+    'pie': ChartTemplate(
+        mark={"type": "arc", "innerRadius": 50},
+        channels=(
+            Channel("theta", ("y_field",), "value", "quantitative"),
+        ),
+        color=Channel("color", ("x_field",), "category", "nominal"),
+        tooltip=(
+            Channel("tooltip", ("x_field",), "category"),
+            Channel("tooltip", ("y_field",), "value"),
+        ),
+    ),
+    'gauge': ChartTemplate(
+        mark={"type": "arc", "innerRadius": 60, "outerRadius": 100},
+        channels=(
+            Channel("theta", (), "value", "quantitative", {"stack": True}),
+        ),
+        color=Channel(
+            "color", (), "segment", "nominal",
+            {"scale": {"domain": ["Value", "Remaining"]}, "legend": None},
+        ),
+        color_mode='range',
+        colors=("cyan", "#1e293b"),
+        layout={"width": 200, "height": 200},
+        data_builder=_gauge_data,
+    ),
+    'funnel': ChartTemplate(
+        mark={"type": "bar", "cornerRadiusEnd": 4},
+        channels=(
+            Channel("y", ("x_field",), "stage", "ordinal", {"sort": None, "title": None}),
+            Channel("x", ("y_field",), "value", "quantitative"),
+        ),
+        color=Channel("color", ("x_field",), "stage", "nominal", {"legend": None}),
+    ),
+    'heatmap': ChartTemplate(
+        mark="rect",
+        channels=(
+            Channel("x", ("x_field",), "x", "ordinal"),
+            Channel("y", ("y_field",), "y", "ordinal"),
+        ),
+        color=Channel("color", ("color_field",), "value", "quantitative"),
+        color_mode='range',
+        colors=("purple", "cyan"),
+    ),
+    'radial': ChartTemplate(
+        mark={"type": "arc", "innerRadius": 30},
+        channels=(
+            Channel("theta", ("y_field",), "value", "quantitative", {"stack": True}),
+        ),
+        color=Channel("color", ("x_field",), "category", "nominal"),
+    ),
+    'timeline': ChartTemplate(
+        mark={"type": "circle", "size": 100},
+        channels=(
+            Channel("x", ("x_field",), "date", "temporal"),
+            Channel("y", extra={"value": 0}),
+        ),
+        color=Channel("color", ("color_field",), "category", "nominal"),
+        tooltip=(
+            Channel("tooltip", ("x_field",), "date"),
+            Channel("tooltip", (), "event", "nominal"),
+        ),
+        layout={"height": 80},
+    ),
+}
+
+
+_COLOR_MODES = ('palette', 'fixed', 'range')
+
+
+class _Expr(str):
+    """Python source that repr() emits verbatim, for splicing into a generated literal."""
+    
+    def __repr__(self) -> str:
+        return str(self)
+
+
+def _channel_literal(channel: Channel, scale: Any = None) -> Dict:
+    """Lay out one channel as a literal, with the field read from the request."""
+    if channel.sources and channel.default is None:
+        raise ValueError(f"Channel {channel.name!r} reads {channel.sources} but has no default")
+    enc: Dict[str, Any] = {}
+    if channel.sources or channel.default is not None:
+        fields = [f"request.{src}" for src in channel.sources] + [repr(channel.default)]
+        enc["field"] = _Expr(" or ".join(fields))
+    if channel.type is not None:
+        enc["type"] = channel.type
+    enc.update(channel.extra)
+    if scale is not None:
+        enc["scale"] = dict(enc.get("scale", {}), **scale)
+    return enc
+
+
+def _compile_template(name: str, template: ChartTemplate) -> Callable[[Dict, VizRequest], None]:
+    """
+    Compile a template into a function that fills a base spec in place.
+    
+    The generated function is a plain sequence of dict literals, like a
+    hand-written per-chart method, so every spec gets fresh mark/encoding
+    dicts without any copying. Brand colors are still read per call.
+    """
+    if template.color_mode not in _COLOR_MODES:
+        raise ValueError(f"Unknown color_mode {template.color_mode!r} for chart {name!r}")
+    colors = [_Expr(f"BRAND[{c!r}]") if c in BRAND else c for c in template.colors]
+    encoding = {channel.name: _channel_literal(channel) for channel in template.channels}
+    
+    if template.color is not None:
+        if template.color_mode == 'fixed':
+            encoding["color"] = {"value": colors[0]}
+        elif template.color_mode == 'palette':
+            encoding["color"] = _channel_literal(template.color)
+            encoding["color"]["scale"] = _Expr("_PALETTE_SCALE")
+        else:
+            encoding["color"] = _channel_literal(template.color, {"range": colors})
+    
+    if template.tooltip:
+        encoding["tooltip"] = [_channel_literal(channel) for channel in template.tooltip]
+    
+    lines = [f"def _render_{name}(spec, request):"]
+    if template.data_builder is not None:
+        # Built rows replace any columnar payload, so drop its flatten too
+        lines.append('    spec["data"] = {"values": data_builder(request)}')
+        lines.append('    spec.pop("transform", None)')
+    lines.append(f'    spec["mark"] = {template.mark!r}')
+    lines.append(f'    spec["encoding"] = {encoding!r}')
+    lines.extend(f'    spec[{key!r}] = {value!r}' for key, value in template.layout.items())
+    
+    namespace = {
+        "BRAND": BRAND,
+        "_PALETTE_SCALE": _PALETTE_SCALE,
+        "data_builder": template.data_builder,
+    }
+    exec(compile("\n".join(lines), f"<chart template {name!r}>", "exec"), namespace)
+    return namespace[f"_render_{name}"]
+
+
+_CHART_BUILDERS = {name: _compile_template(name, t) for name, t in _CHART_TEMPLATES.items()}
+
+
+def _row_count(values: Any) -> int:
+    """Count data points in Columns, a list of rows or a single record."""
+    if isinstance(values, Columns):
+        return len(next(iter(values.values()), []))
+    if isinstance(values, dict):
+        return 1
+    return len(values)
+
+
+def _rendered_rows(spec: Dict) -> int:
+    """Count the rows a spec's inline data renders."""
+    values = spec["data"]["values"]
+    if "transform" in spec:
+        # Columnar payload: a single row of parallel arrays, see _base_spec
+        values = values[0]
+    return _row_count(values)
+
+
 # =============================================================================
 # DYNAMIC VIZ ENGINE
 # =============================================================================
@@ -107,257 +515,273 @@ class DynamicVizEngine:
     its insights to the reader.
     """
     
-    def __init__(self):
-        self.generated_charts: List[Dict] = []
+    DATA_MODES = ('inline', 'url')
     
-    def generate(self, request: VizRequest) -> Dict:
+    __slots__ = (
+        'generated_charts', '_history_limit', '_history_path',
+        '_data_url_threshold', '_data_url_prefix', '_data_store', '_data_store_limit',
+        '_dispatch', '_render_default',
+    )
+    
+    def __init__(
+        self,
+        history_limit: Optional[int] = None,
+        history_path: Optional[str] = None,
+        data_url_threshold: Optional[int] = None,
+        data_url_prefix: str = "/viz-data/",
+        data_store_limit: Optional[int] = None,
+    ):
+        """
+        Create an engine.
+        
+        Args:
+            history_limit: Max charts kept in history (default: DYNAMIC_VIZ_HISTORY
+                env var, or 256)
+            history_path: Optional JSON Lines file that full request/spec
+                payloads are appended to
+            data_url_threshold: Row count above which data is served by URL
+                instead of inlined (default: always inline)
+            data_url_prefix: URL prefix the HTTP layer serves get_data() under
+            data_store_limit: Max datasets kept for get_data(), least recently
+                stored evicted first (default: history_limit, at least 1)
+        """
+        if history_limit is None:
+            history_limit = int(os.getenv("DYNAMIC_VIZ_HISTORY", "256"))
+        self._history_limit = history_limit
+        self._history_path = history_path
+        self.generated_charts: Deque[Dict] = deque(maxlen=history_limit)
+        
+        self._data_url_threshold = data_url_threshold
+        self._data_url_prefix = data_url_prefix
+        self._data_store: Dict[str, Any] = OrderedDict()
+        if data_store_limit is None:
+            data_store_limit = max(history_limit, 1)
+        self._data_store_limit = data_store_limit
+        
+        # Bound once so each generate() dispatches with a single dict lookup
+        self._dispatch = {
+            name: partial(self._render, build=build) for name, build in _CHART_BUILDERS.items()
+        }
+        self._render_default = self._dispatch['bar']
+    
+    def generate(self, request: VizRequest, data_mode: Optional[str] = None) -> Dict:
         """
         Generate a Vega-Lite spec from a visualization request.
         
         Args:
             request: VizRequest with chart details
+            data_mode: 'inline' to embed data, 'url' to reference it via
+                data.url (see get_data). Defaults to data_url_threshold.
             
         Returns:
-            Vega-Lite JSON spec
+            Vega-Lite JSON spec. Only the "config" block and the palette
+            color scale are shared with other specs and must not be mutated;
+            everything else belongs to this spec and may be edited.
+        """
+        logger.info("[DynamicViz] Generating %s: %s", request.chart_type, request.title)
+        
+        spec, rows = self._build(request, data_mode)
+        
+        # Add to history: a lightweight fingerprint in memory, full payload on disk
+        self.generated_charts.append(self._history_entry(request, spec, rows))
+        if self._history_path:
+            self._spill([(request, spec)])
+        
+        return spec
+    
+    def generate_batch(
+        self,
+        requests: List[VizRequest],
+        data_mode: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Generate specs for several requests at once, e.g. a dashboard.
+        
+        Same result as calling generate() for each request, but logs once,
+        extends history in one step and opens the history file once.
+        """
+        logger.info("[DynamicViz] Generating %d charts", len(requests))
+        
+        built = [self._build(request, data_mode) for request in requests]
+        specs = [spec for spec, _ in built]
+        
+        self.generated_charts.extend(
+            self._history_entry(request, spec, rows)
+            for request, (spec, rows) in zip(requests, built)
+        )
+        if self._history_path:
+            self._spill(zip(requests, specs))
+        
+        return specs
+    
+    def _build(self, request: VizRequest, data_mode: Optional[str]) -> Tuple[Dict, int]:
         """
-        logger.info(f"[DynamicViz] Generating {request.chart_type}: {request.title}")
+        Render a request and move its data behind a URL if requested.
         
-        generators = {
-            'bar': self._gen_bar,
-            'line': self._gen_line,
-            'scatter': self._gen_scatter,
-            'pie': self._gen_pie,
-            'gauge': self._gen_gauge,
-            'funnel': self._gen_funnel,
-            'heatmap': self._gen_heatmap,
-            'radial': self._gen_radial,
-            'timeline': self._gen_timeline,
+        Returns the spec and the number of rows it renders.
+        """
+        # Whole specs are deliberately not memoized: the config block is
+        # cached, templates are compiled to direct construction and data is
+        # referenced, not copied, so rendering is O(1) while hashing data for
+        # a key is O(n).
+        # Look chart_type up per call: it is a plain attribute callers may change
+        spec = self._dispatch.get(request.chart_type, self._render_default)(request)
+        rows = _rendered_rows(spec)
+        if self._use_data_url(request, data_mode):
+            spec["data"] = {"url": self._store_data(spec["data"]["values"])}
+        return spec, rows
+    
+    def _history_entry(self, request: VizRequest, spec: Dict, rows: int) -> Dict:
+        """
+        Lightweight history record for a generated chart.
+        
+        Keeps the raw creation timestamp so generate() never formats it;
+        get_history() does that when history is actually read.
+        """
+        return {
+            'title': request.title,
+            'chart_type': request.chart_type,
+            'created_ts': request._created_ts,
+            'spec': self._spec_shape(spec, rows),
         }
+    
+    def _use_data_url(self, request: VizRequest, data_mode: Optional[str]) -> bool:
+        """Decide whether a spec should reference its data by URL."""
+        if data_mode is None:
+            threshold = self._data_url_threshold
+            return threshold is not None and request.row_count() > threshold
+        if data_mode not in self.DATA_MODES:
+            raise ValueError(f"Unknown data_mode {data_mode!r}, expected one of {self.DATA_MODES}")
+        return data_mode == 'url'
+    
+    def _store_data(self, values: Any) -> str:
+        """Store values under a content hash and return the URL to fetch them from."""
+        key = hashlib.blake2b(_dumps_bytes(values), digest_size=16).hexdigest()
+        store = self._data_store
+        if key in store:
+            store.move_to_end(key)
+        else:
+            store[key] = values
+            while len(store) > self._data_store_limit:
+                store.popitem(last=False)
+        return f"{self._data_url_prefix}{key}.json"
+    
+    def get_data(self, key: str) -> Optional[Any]:
+        """
+        Look up data stored for a data.url spec, for the HTTP layer to serve.
         
-        generator = generators.get(request.chart_type, self._gen_bar)
-        spec = generator(request)
+        Returns None for unknown keys, including data evicted once more
+        than data_store_limit datasets have been stored.
         
-        # Add to history
-        self.generated_charts.append({
-            'request': request.to_dict(),
-            'spec': spec,
-        })
+        Args:
+            key: Content hash from the URL (with or without the .json suffix)
+        """
+        if key.endswith('.json'):
+            key = key[:-len('.json')]
+        return self._data_store.get(key)
+    
+    @staticmethod
+    def _spec_shape(spec: Dict, rows: int) -> Dict:
+        """
+        Copy the spec without its inline data, keeping only the row count.
         
-        return spec
+        History can then hold many charts over a shared dataset without
+        pinning the data itself.
+        """
+        shape = {k: v for k, v in spec.items() if k != 'data'}
+        shape['data'] = {'values_len': rows}
+        if 'url' in spec['data']:
+            shape['data']['url'] = spec['data']['url']
+        return shape
+    
+    def _spill(self, charts: Iterable[Tuple[VizRequest, Dict]]) -> None:
+        """Append full (request, spec) payloads to the history file."""
+        with open(self._history_path, 'a', encoding='utf-8') as f:
+            for request, spec in charts:
+                f.write(_dumps({'request': request.to_dict(), 'spec': spec}))
+                f.write('\n')
+    
+    def get_history(self) -> List[Dict]:
+        """Snapshot recent history, oldest first, with ISO-8601 created_at timestamps."""
+        return [
+            {
+                'title': entry['title'],
+                'chart_type': entry['chart_type'],
+                'created_at': datetime.fromtimestamp(entry['created_ts']).isoformat(),
+                'spec': entry['spec'],
+            }
+            for entry in self.generated_charts
+        ]
+    
+    def get_history_full(self) -> List[Dict]:
+        """
+        Replay full payloads from the history file.
+        
+        Returns:
+            One {'request': ..., 'spec': ...} dict per generated chart, oldest
+            first; empty if no history_path was set or nothing was written yet.
+        """
+        if not self._history_path or not os.path.exists(self._history_path):
+            return []
+        with open(self._history_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    
+    def generate_json(self, request: VizRequest, data_mode: Optional[str] = None) -> str:
+        """Generate a spec and return it already serialized to JSON."""
+        return _dumps(self.generate(request, data_mode=data_mode))
     
     def generate_from_dict(self, req_dict: Dict) -> Dict:
         """Generate from a dictionary (for API calls)."""
-        request = VizRequest(
-            title=req_dict.get('title', 'Chart'),
-            chart_type=req_dict.get('chart_type', 'bar'),
-            data=req_dict.get('data', []),
-            x_field=req_dict.get('x_field'),
-            y_field=req_dict.get('y_field'),
-            color_field=req_dict.get('color_field'),
-            description=req_dict.get('description', ''),
-            insight=req_dict.get('insight', ''),
-        )
-        return self.generate(request)
+        return self.generate(VizRequest.from_dict(req_dict))
+    
+    def generate_from_validated(self, req_dict: Dict) -> Dict:
+        """
+        Generate from a dictionary that is already complete and valid.
+        
+        Faster than generate_from_dict for API layers that validate payloads
+        upstream; req_dict must carry every VizRequest field (see to_dict()).
+        """
+        return self.generate(VizRequest._from_validated(req_dict))
     
     # -------------------------------------------------------------------------
-    # Chart Type Generators
+    # Spec Rendering
     # -------------------------------------------------------------------------
     
     def _base_spec(self, request: VizRequest) -> Dict:
-        """Create base spec with brand styling."""
-        return {
-            "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        """
+        Create base spec with brand styling.
+        
+        The "config" block is shared across specs and must not be mutated.
+        """
+        # Read BRAND once per call; it stays live so runtime overrides apply
+        text, text_muted = BRAND["text"], BRAND["text_muted"]
+        config = _base_config(BRAND["bg_dark"], text, text_muted)
+        spec = {
+            "$schema": _VEGA_LITE_SCHEMA,
             "title": {
                 "text": request.title,
-                "color": BRAND["text"],
+                "color": text,
                 "anchor": "start",
                 "fontSize": 16,
                 "subtitle": request.insight if request.insight else None,
-                "subtitleColor": BRAND["text_muted"],
+                "subtitleColor": text_muted,
             },
             "width": 400,
             "height": 250,
             "data": {"values": request.data},
-            "config": {
-                "background": BRAND["bg_dark"],
-                "view": {"stroke": None},
-                "axis": {
-                    "labelColor": BRAND["text_muted"],
-                    "titleColor": BRAND["text"],
-                    "gridColor": "#374151",
-                },
-                "legend": {
-                    "labelColor": BRAND["text_muted"],
-                    "titleColor": BRAND["text"],
-                },
-            }
-        }
-    
-    def _gen_bar(self, request: VizRequest) -> Dict:
-        """Generate bar chart."""
-        spec = self._base_spec(request)
-        spec["mark"] = {"type": "bar", "cornerRadiusEnd": 4}
-        spec["encoding"] = {
-            "x": {"field": request.x_field or "category", "type": "nominal", "title": None},
-            "y": {"field": request.y_field or "value", "type": "quantitative"},
-            "color": {
-                "field": request.color_field or request.x_field or "category",
-                "type": "nominal",
-                "scale": {"range": BRAND_PALETTE},
-                "legend": None,
-            },
-            "tooltip": [
-                {"field": request.x_field or "category"},
-                {"field": request.y_field or "value"},
-            ]
-        }
-        return spec
-    
-    def _gen_line(self, request: VizRequest) -> Dict:
-        """Generate line chart."""
-        spec = self._base_spec(request)
-        spec["mark"] = {"type": "line", "strokeWidth": 3, "point": True}
-        spec["encoding"] = {
-            "x": {"field": request.x_field or "date", "type": "temporal", "title": None},
-            "y": {"field": request.y_field or "value", "type": "quantitative"},
-            "color": {"value": BRAND["cyan"]},
-            "tooltip": [
-                {"field": request.x_field or "date"},
-                {"field": request.y_field or "value"},
-            ]
-        }
-        return spec
-    
-    def _gen_scatter(self, request: VizRequest) -> Dict:
-        """Generate scatter plot."""
-        spec = self._base_spec(request)
-        spec["mark"] = {"type": "circle", "size": 80}
-        spec["encoding"] = {
-            "x": {"field": request.x_field or "x", "type": "quantitative"},
-            "y": {"field": request.y_field or "y", "type": "quantitative"},
-            "color": {
-                "field": request.color_field or "category",
-                "type": "nominal",
-                "scale": {"range": BRAND_PALETTE},
-            },
-            "tooltip": [
-                {"field": request.x_field or "x"},
-                {"field": request.y_field or "y"},
-            ]
+            "config": config,
         }
+        if request._is_columnar:
+            # Columnar payload: ship one row of parallel arrays and let
+            # Vega-Lite zip them back into rows client-side
+            spec["data"] = {"values": [request.data]}
+            spec["transform"] = [{"flatten": list(request.data)}]
         return spec
     
-    def _gen_pie(self, request: VizRequest) -> Dict:
-        """Generate pie/donut chart."""
+    def _render(self, request: VizRequest, build: Callable[[Dict, VizRequest], None]) -> Dict:
+        """Materialize a compiled chart template for a request."""
         spec = self._base_spec(request)
-        spec["mark"] = {"type": "arc", "innerRadius": 50}
-        spec["encoding"] = {
-            "theta": {"field": request.y_field or "value", "type": "quantitative"},
-            "color": {
-                "field": request.x_field or "category",
-                "type": "nominal",
-                "scale": {"range": BRAND_PALETTE},
-            },
-            "tooltip": [
-                {"field": request.x_field or "category"},
-                {"field": request.y_field or "value"},
-            ]
-        }
-        return spec
-    
-    def _gen_gauge(self, request: VizRequest) -> Dict:
-        """Generate gauge chart for single metric."""
-        # Extract the value from data
-        value = request.data[0].get(request.y_field or 'value', 50) if request.data else 50
-        max_val = 100
-        
-        gauge_data = [
-            {"segment": "Value", "value": value},
-            {"segment": "Remaining", "value": max_val - value},
-        ]
-        
-        spec = self._base_spec(request)
-        spec["data"] = {"values": gauge_data}
-        spec["mark"] = {"type": "arc", "innerRadius": 60, "outerRadius": 100}
-        spec["encoding"] = {
-            "theta": {"field": "value", "type": "quantitative", "stack": True},
-            "color": {
-                "field": "segment",
-                "type": "nominal",
-                "scale": {
-                    "domain": ["Value", "Remaining"],
-                    "range": [BRAND["cyan"], "#1e293b"],
-                },
-                "legend": None,
-            },
-        }
-        spec["width"] = 200
-        spec["height"] = 200
-        return spec
-    
-    def _gen_funnel(self, request: VizRequest) -> Dict:
-        """Generate funnel chart."""
-        spec = self._base_spec(request)
-        spec["mark"] = {"type": "bar", "cornerRadiusEnd": 4}
-        spec["encoding"] = {
-            "y": {"field": request.x_field or "stage", "type": "ordinal", "sort": None, "title": None},
-            "x": {"field": request.y_field or "value", "type": "quantitative"},
-            "color": {
-                "field": request.x_field or "stage",
-                "type": "nominal",
-                "scale": {"range": BRAND_PALETTE},
-                "legend": None,
-            },
-        }
-        return spec
-    
-    def _gen_heatmap(self, request: VizRequest) -> Dict:
-        """Generate heatmap."""
-        spec = self._base_spec(request)
-        spec["mark"] = "rect"
-        spec["encoding"] = {
-            "x": {"field": request.x_field or "x", "type": "ordinal"},
-            "y": {"field": request.y_field or "y", "type": "ordinal"},
-            "color": {
-                "field": request.color_field or "value",
-                "type": "quantitative",
-                "scale": {"range": [BRAND["purple"], BRAND["cyan"]]},
-            },
-        }
-        return spec
-    
-    def _gen_radial(self, request: VizRequest) -> Dict:
-        """Generate radial/arc chart."""
-        spec = self._base_spec(request)
-        spec["mark"] = {"type": "arc", "innerRadius": 30}
-        spec["encoding"] = {
-            "theta": {"field": request.y_field or "value", "type": "quantitative", "stack": True},
-            "color": {
-                "field": request.x_field or "category",
-                "type": "nominal",
-                "scale": {"range": BRAND_PALETTE},
-            },
-        }
-        return spec
-    
-    def _gen_timeline(self, request: VizRequest) -> Dict:
-        """Generate timeline with events."""
-        spec = self._base_spec(request)
-        spec["mark"] = {"type": "circle", "size": 100}
-        spec["encoding"] = {
-            "x": {"field": request.x_field or "date", "type": "temporal"},
-            "y": {"value": 0},
-            "color": {
-                "field": request.color_field or "category",
-                "type": "nominal",
-                "scale": {"range": BRAND_PALETTE},
-            },
-            "tooltip": [
-                {"field": request.x_field or "date"},
-                {"field": "event", "type": "nominal"},
-            ]
-        }
-        spec["height"] = 80
+        build(spec, request)
         return spec
 
 
@@ -365,6 +789,36 @@ class DynamicVizEngine:
 # AI VISUALIZATION ASSISTANT
 # =============================================================================
 
+def _pairs_to_records(
+    x_key: str,
+    y_key: str,
+    xs: List[Any],
+    ys: List[Any],
+    order_key: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Zip two parallel series into Vega-Lite row records.
+    
+    If order_key is given, each record also carries its position under that key.
+    """
+    if order_key is None:
+        return [{x_key: x, y_key: y} for x, y in zip(xs, ys)]
+    return [{x_key: x, y_key: y, order_key: i} for i, (x, y) in enumerate(zip(xs, ys))]
+
+
+def _series_data(
+    x_key: str,
+    y_key: str,
+    xs: List[Any],
+    ys: List[Any],
+) -> Union[List[Dict], Columns]:
+    """Use the columnar fast path for large numeric arrays, row records otherwise."""
+    columns = _fastpath.columnar_series(x_key, y_key, xs, ys)
+    if columns is not None:
+        return columns
+    return _pairs_to_records(x_key, y_key, xs, ys)
+
+
 class AIVizAssistant:
     """
     Provides a natural language interface for AI to request visualizations.
@@ -373,8 +827,10 @@ class AIVizAssistant:
     and this assistant generates the appropriate chart.
     """
     
-    def __init__(self):
-        self.engine = DynamicVizEngine()
+    __slots__ = ('engine',)
+    
+    def __init__(self, engine: Optional[DynamicVizEngine] = None):
+        self.engine = engine if engine is not None else DynamicVizEngine()
     
     def visualize_comparison(
         self,
@@ -388,7 +844,7 @@ class AIVizAssistant:
         
         Example: "Compare market share: [Microsoft 35%, Google 30%, Amazon 25%]"
         """
-        data = [{"category": cat, "value": val} for cat, val in zip(categories, values)]
+        data = _series_data("category", "value", categories, values)
         request = VizRequest(
             title=title,
             chart_type='bar',
@@ -411,7 +867,7 @@ class AIVizAssistant:
         
         Example: "Show competitor growth Q1-Q4"
         """
-        data = [{"date": d, "value": v} for d, v in zip(dates, values)]
+        data = _series_data("date", "value", dates, values)
         request = VizRequest(
             title=title,
             chart_type='line',
@@ -434,7 +890,7 @@ class AIVizAssistant:
         
         Example: "Market segment breakdown"
         """
-        data = [{"category": cat, "value": val} for cat, val in zip(categories, values)]
+        data = _pairs_to_records("category", "value", categories, values)
         request = VizRequest(
             title=title,
             chart_type='pie',
@@ -479,7 +935,7 @@ class AIVizAssistant:
         
         Example: "Sales pipeline: Leads→Qualified→Proposals→Closed"
         """
-        data = [{"stage": s, "value": v, "order": i} for i, (s, v) in enumerate(zip(stages, values))]
+        data = _pairs_to_records("stage", "value", stages, values, order_key="order")
         request = VizRequest(
             title=title,
             chart_type='funnel',
@@ -490,6 +946,32 @@ class AIVizAssistant:
         )
         return self.engine.generate(request)
     
+    def visualize_heatmap_array(
+        self,
+        title: str,
+        matrix: Any,
+        x_labels: Optional[List] = None,
+        y_labels: Optional[List] = None,
+        skip_zeros: bool = True,
+        insight: str = ""
+    ) -> Dict:
+        """
+        Create a heatmap from a 2-D array (requires numpy).
+        
+        Example: "Feature overlap matrix across competitors"
+        """
+        data = _fastpath.matrix_cells(matrix, x_labels, y_labels, skip_zeros)
+        request = VizRequest(
+            title=title,
+            chart_type='heatmap',
+            data=data,
+            x_field='x',
+            y_field='y',
+            color_field='value',
+            insight=insight,
+        )
+        return self.engine.generate(request)
+    
     def visualize_custom(self, request_dict: Dict) -> Dict:
         """
         Generate a custom visualization from a dictionary spec.
@@ -498,6 +980,23 @@ class AIVizAssistant:
         """
         return self.engine.generate_from_dict(request_dict)
     
+    def visualize_batch(self, request_dicts: List[Dict]) -> List[Dict]:
+        """
+        Generate several custom visualizations in one pass.
+        
+        For multi-chart dashboards; each dict is as for visualize_custom().
+        """
+        requests = [VizRequest.from_dict(d) for d in request_dicts]
+        return self.engine.generate_batch(requests)
+    
     def get_chart_history(self) -> List[Dict]:
-        """Get all charts generated in this session."""
-        return self.engine.generated_charts
+        """Get the recent charts generated in this session, with data-less specs."""
+        return self.engine.get_history()
+    
+    def get_chart_history_full(self) -> List[Dict]:
+        """Get full request/spec payloads spilled to disk ([] if history_path is unset)."""
+        return self.engine.get_history_full()
+    
+    def get_chart_history_json(self) -> str:
+        """Get the recent charts generated in this session as one JSON document."""
+        return _dumps(self.engine.get_history())
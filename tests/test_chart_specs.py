@@ -0,0 +1,70 @@
+"""Golden-output tests: every chart type must render exactly as recorded."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from dynamic_viz.core import Channel, ChartTemplate, DynamicVizEngine, VizRequest, _compile_template
+
+GOLDEN_PATH = Path(__file__).parent / "golden_specs.json"
+
+ROWS = [
+    {"category": "a", "value": 3, "date": "2024-01-01", "x": 1, "y": 2, "stage": "Leads"},
+    {"category": "b", "value": 5, "date": "2024-02-01", "x": 2, "y": 4, "stage": "Won"},
+]
+
+FIELD_CASES = {
+    "defaults": {},
+    "custom_fields": {"x_field": "x", "y_field": "y", "color_field": "category"},
+    "x_only": {"x_field": "stage"},
+    "insight": {"insight": "Key takeaway"},
+}
+
+CASES = {
+    f"{chart_type}/{case}": dict(
+        {"title": f"{chart_type} {case}", "chart_type": chart_type, "data": ROWS}, **fields
+    )
+    for chart_type in VizRequest.CHART_TYPES
+    for case, fields in FIELD_CASES.items()
+}
+
+
+def render(case):
+    return DynamicVizEngine().generate_from_dict(case)
+
+
+@pytest.fixture(scope="module")
+def golden():
+    return json.loads(GOLDEN_PATH.read_text())
+
+
+def test_golden_covers_every_chart_type(golden):
+    assert set(golden) == set(CASES)
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_spec_matches_golden(golden, name):
+    assert json.loads(json.dumps(render(CASES[name]))) == golden[name]
+
+
+@pytest.mark.parametrize("chart_type", VizRequest.CHART_TYPES)
+def test_editing_a_spec_leaves_templates_untouched(golden, chart_type):
+    spec = render(CASES[f"{chart_type}/defaults"])
+    if isinstance(spec["mark"], dict):
+        spec["mark"]["type"] = "edited"
+    for channel in spec["encoding"].values():
+        if isinstance(channel, dict):
+            channel.clear()
+
+    key = f"{chart_type}/defaults"
+    assert json.loads(json.dumps(render(CASES[key]))) == golden[key]
+
+
+@pytest.mark.parametrize("template", [
+    ChartTemplate(mark="bar", channels=(Channel("x", ("x_field",)),)),
+    ChartTemplate(mark="bar", channels=(), color=Channel("color"), color_mode="gradient"),
+])
+def test_malformed_template_is_rejected_at_compile_time(template):
+    with pytest.raises(ValueError):
+        _compile_template("broken", template)
@@ -0,0 +1,277 @@
+"""Tests for the visualization engine and assistant."""
+
+import json
+
+import pytest
+
+from dynamic_viz import AIVizAssistant, core
+from dynamic_viz.core import Columns, DynamicVizEngine, VizRequest
+
+
+def make_request(chart_type="bar", **kwargs):
+    data = kwargs.pop("data", [{"category": "a", "value": 1}, {"category": "b", "value": 2}])
+    return VizRequest(title="Chart", chart_type=chart_type, data=data, **kwargs)
+
+
+def test_unknown_chart_type_falls_back_to_bar():
+    assert make_request("sparkline").chart_type == "bar"
+
+
+def test_dispatch_follows_chart_type_changed_after_construction():
+    engine = DynamicVizEngine()
+    request = make_request("bar")
+    request.chart_type = "line"
+
+    spec = engine.generate(request)
+
+    assert spec["mark"]["type"] == "line"
+    assert engine.generated_charts[-1]["chart_type"] == "line"
+
+
+def test_dispatch_falls_back_to_bar_for_unknown_chart_type_set_later():
+    request = make_request("pie")
+    request.chart_type = "sparkline"
+    assert DynamicVizEngine().generate(request)["mark"]["type"] == "bar"
+
+
+def test_editing_a_spec_does_not_leak_into_later_specs():
+    engine = DynamicVizEngine()
+    first = engine.generate(make_request("bar"))
+    first["encoding"]["x"]["title"] = "Company"
+    first["encoding"]["tooltip"][0]["field"] = "other"
+    first["mark"]["color"] = "red"
+
+    second = engine.generate(make_request("bar"))
+
+    assert second["encoding"]["x"]["title"] is None
+    assert second["encoding"]["tooltip"][0]["field"] == "category"
+    assert "color" not in second["mark"]
+
+
+def test_palette_scale_is_shared_between_specs():
+    engine = DynamicVizEngine()
+    pie = engine.generate(make_request("pie"))
+    bar = engine.generate(make_request("bar"))
+    assert pie["encoding"]["color"]["scale"] is core._PALETTE_SCALE
+    assert bar["encoding"]["color"]["scale"] is core._PALETTE_SCALE
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_output_accepts_numpy_values(monkeypatch, use_orjson):
+    np = pytest.importorskip("numpy")
+    if use_orjson and not core.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(core, "ORJSON_AVAILABLE", use_orjson)
+    assistant = AIVizAssistant()
+
+    assistant.visualize_comparison("Share", ["a", "b"], np.array([1, 2]))
+    history = json.loads(assistant.get_chart_history_json())
+    request = make_request(data=[{"value": np.float64(1.5)}])
+    spec = json.loads(assistant.engine.generate_json(request))
+
+    assert history[0]["title"] == "Share"
+    assert spec["data"]["values"] == [{"value": 1.5}]
+
+
+def test_history_is_bounded():
+    engine = DynamicVizEngine(history_limit=2)
+    for title in ("a", "b", "c"):
+        engine.generate(VizRequest(title, "bar", []))
+    assert [entry["title"] for entry in engine.generated_charts] == ["b", "c"]
+
+
+def test_history_limit_defaults_to_env(monkeypatch):
+    monkeypatch.setenv("DYNAMIC_VIZ_HISTORY", "1")
+    assert DynamicVizEngine().generated_charts.maxlen == 1
+
+
+def test_history_keeps_fingerprint_without_data():
+    engine = DynamicVizEngine()
+    engine.generate(make_request("pie"))
+    entry = engine.generated_charts[-1]
+    assert entry["chart_type"] == "pie"
+    assert entry["spec"]["data"] == {"values_len": 2}
+    assert "created_ts" in entry
+
+
+def test_history_formats_created_at_only_when_read():
+    assistant = AIVizAssistant()
+    request = make_request("bar")
+    assistant.engine.generate(request)
+
+    assert request._created_at is None
+    history = assistant.get_chart_history()
+    assert history[0]["created_at"] == request.created_at
+    assert json.loads(assistant.get_chart_history_json()) == history
+
+
+def test_history_full_is_empty_without_history_path():
+    assistant = AIVizAssistant()
+    assistant.visualize_metric("Score", 80)
+    assert assistant.get_chart_history_full() == []
+
+
+def test_history_spills_and_replays_full_payloads(tmp_path):
+    path = tmp_path / "history.jsonl"
+    assistant = AIVizAssistant(DynamicVizEngine(history_limit=1, history_path=str(path)))
+    assistant.visualize_comparison("First", ["a"], [1])
+    assistant.visualize_trend("Second", ["2024-01"], [2])
+
+    full = assistant.get_chart_history_full()
+
+    assert len(assistant.get_chart_history()) == 1
+    assert [entry["request"]["title"] for entry in full] == ["First", "Second"]
+    assert full[0]["spec"]["data"] == {"values": [{"category": "a", "value": 1}]}
+
+
+def test_generate_batch_matches_generate(tmp_path):
+    requests = [make_request("bar"), make_request("pie"), make_request("gauge")]
+    batch_engine = DynamicVizEngine(history_path=str(tmp_path / "batch.jsonl"))
+    single_engine = DynamicVizEngine()
+
+    specs = batch_engine.generate_batch(requests)
+
+    assert specs == [single_engine.generate(request) for request in requests]
+    assert [e["chart_type"] for e in batch_engine.generated_charts] == ["bar", "pie", "gauge"]
+    assert len(batch_engine.get_history_full()) == 3
+
+
+def test_visualize_batch_builds_requests_from_dicts():
+    specs = AIVizAssistant().visualize_batch([{"title": "A"}, {"title": "B", "chart_type": "line"}])
+    assert [spec["mark"]["type"] for spec in specs] == ["bar", "line"]
+
+
+def test_generate_json_round_trips():
+    engine = DynamicVizEngine()
+    request = make_request("scatter")
+    assert json.loads(engine.generate_json(request)) == engine.generate(request)
+
+
+def test_columnar_data_adds_flatten_transform():
+    request = make_request("bar", data=Columns(category=["a", "b"], value=[1, 2]))
+    spec = DynamicVizEngine().generate(request)
+    assert spec["data"] == {"values": [{"category": ["a", "b"], "value": [1, 2]}]}
+    assert spec["transform"] == [{"flatten": ["category", "value"]}]
+
+
+@pytest.mark.parametrize("record", [{"category": "a", "value": 1}, {"value": 1, "category": "a"}])
+def test_plain_dict_data_is_a_single_inline_record(record):
+    spec = AIVizAssistant().visualize_custom({"title": "One", "data": record})
+    assert spec["data"] == {"values": record}
+    assert "transform" not in spec
+
+
+def test_gauge_with_columnar_data_drops_flatten_transform():
+    spec = DynamicVizEngine().generate(make_request("gauge", data=Columns(value=[85])))
+    assert spec["data"] == {"values": [
+        {"segment": "Value", "value": 85},
+        {"segment": "Remaining", "value": 15},
+    ]}
+    assert "transform" not in spec
+
+
+def test_structured_array_becomes_columns():
+    np = pytest.importorskip("numpy")
+    data = np.array([(1, 2.0), (3, 4.0)], dtype=[("x", "i4"), ("y", "f8")])
+    request = make_request("scatter", data=data, x_field="x", y_field="y")
+    assert request.data == {"x": [1, 3], "y": [2.0, 4.0]}
+    assert request.row_count() == 2
+
+
+def test_dataframe_becomes_columns():
+    pd = pytest.importorskip("pandas")
+    frame = pd.DataFrame({"category": ["a", "b"], "value": [1, 2]})
+    spec = DynamicVizEngine().generate(make_request("bar", data=frame))
+    assert spec["data"]["values"] == [{"category": ["a", "b"], "value": [1, 2]}]
+
+
+def test_visualize_heatmap_array_skips_zero_cells():
+    np = pytest.importorskip("numpy")
+    spec = AIVizAssistant().visualize_heatmap_array(
+        "Overlap", np.array([[3, 0], [1, 5]]), x_labels=["A", "B"], y_labels=["r1", "r2"],
+    )
+    assert spec["data"]["values"] == [
+        {"x": ["A", "A", "B"], "y": ["r1", "r2", "r2"], "value": [3, 1, 5]}
+    ]
+    assert spec["encoding"]["color"]["field"] == "value"
+
+
+def test_visualize_heatmap_array_can_keep_zero_cells():
+    np = pytest.importorskip("numpy")
+    spec = AIVizAssistant().visualize_heatmap_array("Identity", np.eye(2), skip_zeros=False)
+    assert spec["data"]["values"][0]["value"] == [1.0, 0.0, 0.0, 1.0]
+
+
+def test_visualize_heatmap_array_rejects_non_matrix():
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        AIVizAssistant().visualize_heatmap_array("Bad", [1, 2, 3])
+
+
+def test_data_mode_url_serves_data_via_get_data():
+    engine = DynamicVizEngine()
+    request = make_request("bar")
+
+    spec = engine.generate(request, data_mode="url")
+
+    url = spec["data"]["url"]
+    assert url.startswith("/viz-data/") and url.endswith(".json")
+    assert engine.get_data(url.rsplit("/", 1)[1]) == request.data
+    assert engine.generated_charts[-1]["spec"]["data"] == {"values_len": 2, "url": url}
+
+
+def test_data_url_threshold_picks_mode():
+    engine = DynamicVizEngine(data_url_threshold=1)
+    assert "url" in engine.generate(make_request("bar"))["data"]
+    assert "values" in engine.generate(make_request("bar", data=[{"value": 1}]))["data"]
+    assert "values" in engine.generate(make_request("bar"), data_mode="inline")["data"]
+
+
+def test_unknown_data_mode_raises():
+    with pytest.raises(ValueError):
+        DynamicVizEngine().generate(make_request(), data_mode="blob")
+
+
+def test_data_store_evicts_least_recent():
+    engine = DynamicVizEngine(data_store_limit=2)
+    keys = []
+    for value in range(3):
+        spec = engine.generate(make_request(data=[{"value": value}]), data_mode="url")
+        keys.append(spec["data"]["url"].rsplit("/", 1)[1])
+
+    assert engine.get_data(keys[0]) is None
+    assert engine.get_data(keys[2]) == [{"value": 2}]
+
+
+def test_data_store_limit_defaults_to_history_limit():
+    engine = DynamicVizEngine(history_limit=1)
+    first = engine.generate(make_request(data=[{"value": 1}]), data_mode="url")["data"]["url"]
+    engine.generate(make_request(data=[{"value": 2}]), data_mode="url")
+    assert engine.get_data(first.rsplit("/", 1)[1]) is None
+
+
+def test_history_records_rendered_row_count():
+    engine = DynamicVizEngine()
+    engine.generate(make_request("gauge", data=[{"value": 40}]))
+    engine.generate(make_request("bar", data=Columns(category=["a", "b", "c"], value=[1, 2, 3])))
+    engine.generate(make_request("bar", data={"value": 1, "category": "a"}))
+    counts = [entry["spec"]["data"]["values_len"] for entry in engine.generated_charts]
+    assert counts == [2, 3, 1]
+
+
+def test_single_record_counts_as_one_row_for_threshold():
+    engine = DynamicVizEngine(data_url_threshold=1)
+    spec = engine.generate(make_request("bar", data={"category": "a", "value": 1}))
+    assert spec["data"] == {"values": {"category": "a", "value": 1}}
+
+
+def test_from_validated_matches_regular_constructor():
+    req_dict = make_request("funnel", x_field="stage", insight="Drop-off").to_dict()
+    fast = VizRequest._from_validated(req_dict)
+    regular = VizRequest.from_dict(req_dict)
+
+    for slot in VizRequest.__slots__:
+        if slot not in ("_created_ts", "_created_at"):
+            assert getattr(fast, slot) == getattr(regular, slot)
+    engine = DynamicVizEngine()
+    assert engine.generate_from_validated(req_dict) == engine.generate(regular)
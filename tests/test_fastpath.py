@@ -0,0 +1,49 @@
+"""Tests for the optional NumPy fast paths."""
+
+import subprocess
+import sys
+
+import pytest
+
+from dynamic_viz import AIVizAssistant
+from dynamic_viz._fastpath import FASTPATH_MIN_SIZE
+
+
+def test_import_does_not_load_numpy():
+    code = "import sys, dynamic_viz; sys.exit('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], env={"PYTHONPATH": ":".join(sys.path)})
+    assert result.returncode == 0
+
+
+def test_small_series_uses_row_records():
+    spec = AIVizAssistant().visualize_trend("Trend", ["2024-01", "2024-02"], [1, 2])
+    assert spec["data"] == {
+        "values": [{"date": "2024-01", "value": 1}, {"date": "2024-02", "value": 2}]
+    }
+    assert "transform" not in spec
+
+
+def test_large_array_uses_columns():
+    np = pytest.importorskip("numpy")
+    n = FASTPATH_MIN_SIZE + 1
+    spec = AIVizAssistant().visualize_trend("Trend", [f"d{i}" for i in range(n)], np.arange(n))
+    assert spec["transform"] == [{"flatten": ["date", "value"]}]
+    assert spec["data"]["values"][0]["value"] == list(range(n))
+
+
+def test_large_array_accepts_unsized_dates():
+    np = pytest.importorskip("numpy")
+    n = FASTPATH_MIN_SIZE + 1
+    dates = (f"d{i}" for i in range(n))
+    spec = AIVizAssistant().visualize_trend("Trend", dates, np.arange(n, dtype=float))
+    assert spec["data"]["values"][0]["date"][-1] == f"d{n - 1}"
+
+
+def test_non_finite_values_fall_back_to_records():
+    np = pytest.importorskip("numpy")
+    values = np.arange(FASTPATH_MIN_SIZE + 1, dtype=float)
+    values[3] = np.nan
+    dates = (f"d{i}" for i in range(values.size))
+    spec = AIVizAssistant().visualize_trend("Trend", dates, values)
+    assert "transform" not in spec
+    assert len(spec["data"]["values"]) == values.size